@@ -12,9 +12,21 @@ This server wraps an existing OakVar installation and provides:
 - System management (setup, check)
 """
 
-import json
+import asyncio
+import copy
+import io
 import logging
-from typing import Any, Dict, List, Optional
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import orjson
+from jsonschema import Draft202012Validator
+from jsonschema.exceptions import best_match
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import (
@@ -29,536 +41,620 @@ logger = logging.getLogger("oakvar-mcp")
 # Create the MCP server instance
 server = Server("oakvar-mcp")
 
+# orjson options for tool responses; non-string keys are stringified like json.dumps
+_ORJSON_OPTIONS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
 
-def _format_response(data: Any, success: bool = True, error: Optional[str] = None) -> str:
-    """Format a response as JSON for MCP clients."""
+# Number of rows fetched per batch when streaming query results
+_QUERY_FETCH_SIZE = 500
+
+# LRU pool of read-only oakvar_query connections, keyed by database file
+_CONN_POOL_SIZE = 8
+_CONN_POOL: "OrderedDict[Tuple[str, int, int], sqlite3.Connection]" = OrderedDict()
+_CONN_POOL_LOCK = threading.Lock()
+
+# Serialized responses for tools whose output rarely changes. The version is
+# fixed for the server's lifetime; the system check is reused for a short TTL.
+_VERSION_CACHE: Optional[str] = None
+_SYSTEM_CHECK_CACHE: Optional[Tuple[float, str]] = None
+_SYSTEM_CHECK_TTL = 30.0  # seconds
+
+# Keyword checks for oakvar_query, matched on token boundaries
+_SELECT_RE = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+_LIMIT_RE = re.compile(r"\bLIMIT\b", re.IGNORECASE)
+
+
+def _format_response_obj(data: Any, success: bool = True, error: Optional[str] = None) -> Dict[str, Any]:
+    """Build the response envelope for MCP clients, before serialization."""
     response = {
         "success": success,
         "data": data,
     }
     if error:
         response["error"] = error
-    return json.dumps(response, default=str, indent=2)
+    return response
+
+
+def _format_response(data: Any, success: bool = True, error: Optional[str] = None) -> str:
+    """Format a response as JSON for MCP clients."""
+    response = _format_response_obj(data, success=success, error=error)
+    return orjson.dumps(response, default=str, option=_ORJSON_OPTIONS).decode()
+
+
+# Cached reference to the oakvar module, resolved on first use
+_OV = None
 
 
 def _ensure_oakvar():
     """Ensure OakVar is available and importable."""
-    try:
-        import oakvar
-        return oakvar
-    except ImportError:
-        raise RuntimeError(
-            "OakVar is not installed in the current Python environment. Install OakVar (e.g., `pip install oakvar`) into the same environment as oakvar-mcp."
-        )
+    global _OV
+    if _OV is None:
+        try:
+            import oakvar
+        except ImportError:
+            raise RuntimeError(
+                "OakVar is not installed in the current Python environment. Install OakVar (e.g., `pip install oakvar`) into the same environment as oakvar-mcp."
+            )
+        _OV = oakvar
+    return _OV
 
 
 # =============================================================================
 # Tool Definitions
 # =============================================================================
 
-@server.list_tools()
-async def list_tools() -> List[Tool]:
-    """List all available OakVar MCP tools."""
-    return [
-        # --- System Tools ---
-        Tool(
-            name="oakvar_version",
-            description="Get the installed OakVar version",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "required": [],
-            },
-        ),
-        Tool(
-            name="oakvar_system_check",
-            description="Perform OakVar system checkup to verify installation",
-            inputSchema={
-                "type": "object",
-                "properties": {},
-                "required": [],
+# The tool list is static, so it is built once at import time rather than on
+# every list_tools request.
+_TOOLS: List[Tool] = [
+    # --- System Tools ---
+    Tool(
+        name="oakvar_version",
+        description="Get the installed OakVar version",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "required": [],
+        },
+    ),
+    Tool(
+        name="oakvar_system_check",
+        description="Perform OakVar system checkup to verify installation",
+        inputSchema={
+            "type": "object",
+            "properties": {},
+            "required": [],
+        },
+    ),
+    Tool(
+        name="oakvar_system_setup",
+        description="Setup or configure OakVar system",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "clean": {
+                    "type": "boolean",
+                    "description": "Perform clean installation",
+                    "default": False,
+                },
+                "refresh_db": {
+                    "type": "boolean",
+                    "description": "Refresh store server data",
+                    "default": False,
+                },
             },
-        ),
-        Tool(
-            name="oakvar_system_setup",
-            description="Setup or configure OakVar system",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "clean": {
-                        "type": "boolean",
-                        "description": "Perform clean installation",
-                        "default": False,
-                    },
-                    "refresh_db": {
-                        "type": "boolean",
-                        "description": "Refresh store server data",
-                        "default": False,
-                    },
+            "required": [],
+        },
+    ),
+    Tool(
+        name="oakvar_modules_dir",
+        description="Get or set the OakVar modules directory",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "directory": {
+                    "type": "string",
+                    "description": "New modules directory path (optional, omit to get current)",
                 },
-                "required": [],
             },
-        ),
-        Tool(
-            name="oakvar_modules_dir",
-            description="Get or set the OakVar modules directory",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "directory": {
-                        "type": "string",
-                        "description": "New modules directory path (optional, omit to get current)",
-                    },
+            "required": [],
+        },
+    ),
+    # --- Module Tools ---
+    Tool(
+        name="oakvar_module_list",
+        description="List installed and/or available OakVar modules",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "module_names": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Module name patterns to filter (regex supported)",
+                    "default": [".*"],
+                },
+                "module_types": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Filter by module types (annotator, reporter, etc.)",
+                    "default": [],
+                },
+                "search_store": {
+                    "type": "boolean",
+                    "description": "Include modules from OakVar store (not just locally installed)",
+                    "default": False,
+                },
+                "tags": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Filter by tags (regex supported)",
+                    "default": [],
+                },
+                "fields": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Only return these keys for each module (e.g., 'name', 'version')",
                 },
-                "required": [],
             },
-        ),
-        # --- Module Tools ---
-        Tool(
-            name="oakvar_module_list",
-            description="List installed and/or available OakVar modules",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "module_names": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Module name patterns to filter (regex supported)",
-                        "default": [".*"],
-                    },
-                    "module_types": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Filter by module types (annotator, reporter, etc.)",
-                    },
-                    "search_store": {
-                        "type": "boolean",
-                        "description": "Include modules from OakVar store (not just locally installed)",
-                        "default": False,
-                    },
-                    "tags": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Filter by tags (regex supported)",
-                    },
+            "required": [],
+        },
+    ),
+    Tool(
+        name="oakvar_module_info",
+        description="Get detailed information about a specific module",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "module_name": {
+                    "type": "string",
+                    "description": "Name of the module to get info for",
+                },
+                "local": {
+                    "type": "boolean",
+                    "description": "Only check local installation (skip store lookup)",
+                    "default": False,
                 },
-                "required": [],
             },
-        ),
-        Tool(
-            name="oakvar_module_info",
-            description="Get detailed information about a specific module",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "module_name": {
-                        "type": "string",
-                        "description": "Name of the module to get info for",
-                    },
-                    "local": {
-                        "type": "boolean",
-                        "description": "Only check local installation (skip store lookup)",
-                        "default": False,
-                    },
+            "required": ["module_name"],
+        },
+    ),
+    Tool(
+        name="oakvar_module_install",
+        description="Install OakVar modules from the store",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "module_names": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "List of module names to install",
+                },
+                "overwrite": {
+                    "type": "boolean",
+                    "description": "Overwrite existing modules",
+                    "default": False,
+                },
+                "skip_dependencies": {
+                    "type": "boolean",
+                    "description": "Skip installing module dependencies",
+                    "default": False,
                 },
-                "required": ["module_name"],
             },
-        ),
-        Tool(
-            name="oakvar_module_install",
-            description="Install OakVar modules from the store",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "module_names": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "List of module names to install",
-                    },
-                    "overwrite": {
-                        "type": "boolean",
-                        "description": "Overwrite existing modules",
-                        "default": False,
-                    },
-                    "skip_dependencies": {
-                        "type": "boolean",
-                        "description": "Skip installing module dependencies",
-                        "default": False,
-                    },
+            "required": ["module_names"],
+        },
+    ),
+    Tool(
+        name="oakvar_module_uninstall",
+        description="Uninstall OakVar modules",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "module_names": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "List of module names to uninstall",
                 },
-                "required": ["module_names"],
             },
-        ),
-        Tool(
-            name="oakvar_module_uninstall",
-            description="Uninstall OakVar modules",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "module_names": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "List of module names to uninstall",
-                    },
+            "required": ["module_names"],
+        },
+    ),
+    Tool(
+        name="oakvar_module_update",
+        description="Update installed OakVar modules to latest versions",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "module_name_patterns": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Module name patterns to update (regex supported)",
+                    "default": [],
                 },
-                "required": ["module_names"],
             },
-        ),
-        Tool(
-            name="oakvar_module_update",
-            description="Update installed OakVar modules to latest versions",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "module_name_patterns": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Module name patterns to update (regex supported)",
-                    },
+            "required": [],
+        },
+    ),
+    # --- Pipeline Tools ---
+    Tool(
+        name="oakvar_run",
+        description="Run the OakVar annotation pipeline on input files",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "inputs": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Paths to input files (VCF, etc.)",
+                },
+                "annotators": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "List of annotator modules to run",
+                    "default": [],
+                },
+                "report_types": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Report types to generate (e.g., 'vcf', 'excel', 'csv')",
+                    "default": [],
+                },
+                "output_dir": {
+                    "type": "string",
+                    "description": "Output directory for results",
+                },
+                "genome": {
+                    "type": "string",
+                    "description": "Genome assembly (e.g., 'hg38', 'hg19')",
+                },
+                "run_name": {
+                    "type": "string",
+                    "description": "Name for this analysis run",
+                },
+                "mp": {
+                    "type": "integer",
+                    "description": "Number of cores to use for parallel processing",
                 },
-                "required": [],
             },
-        ),
-        # --- Pipeline Tools ---
-        Tool(
-            name="oakvar_run",
-            description="Run the OakVar annotation pipeline on input files",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "inputs": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Paths to input files (VCF, etc.)",
-                    },
-                    "annotators": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "List of annotator modules to run",
-                    },
-                    "report_types": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Report types to generate (e.g., 'vcf', 'excel', 'csv')",
-                    },
-                    "output_dir": {
-                        "type": "string",
-                        "description": "Output directory for results",
-                    },
-                    "genome": {
-                        "type": "string",
-                        "description": "Genome assembly (e.g., 'hg38', 'hg19')",
-                    },
-                    "run_name": {
-                        "type": "string",
-                        "description": "Name for this analysis run",
-                    },
-                    "mp": {
-                        "type": "integer",
-                        "description": "Number of cores to use for parallel processing",
-                    },
+            "required": ["inputs"],
+        },
+    ),
+    Tool(
+        name="oakvar_report",
+        description="Generate reports from an existing OakVar result database",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "dbpath": {
+                    "type": "string",
+                    "description": "Path to OakVar result SQLite database",
+                },
+                "report_types": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Report types to generate",
+                },
+                "output_dir": {
+                    "type": "string",
+                    "description": "Output directory for reports",
+                },
+                "filterpath": {
+                    "type": "string",
+                    "description": "Path to filter configuration file",
+                },
+                "filtersql": {
+                    "type": "string",
+                    "description": "SQL filter expression",
+                },
+                "cols": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Specific columns to include in report",
                 },
-                "required": ["inputs"],
             },
-        ),
-        Tool(
-            name="oakvar_report",
-            description="Generate reports from an existing OakVar result database",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "dbpath": {
-                        "type": "string",
-                        "description": "Path to OakVar result SQLite database",
-                    },
-                    "report_types": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Report types to generate",
-                    },
-                    "output_dir": {
-                        "type": "string",
-                        "description": "Output directory for reports",
-                    },
-                    "filterpath": {
-                        "type": "string",
-                        "description": "Path to filter configuration file",
-                    },
-                    "filtersql": {
-                        "type": "string",
-                        "description": "SQL filter expression",
-                    },
-                    "cols": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Specific columns to include in report",
-                    },
+            "required": ["dbpath"],
+        },
+    ),
+    # --- Data Tools ---
+    Tool(
+        name="oakvar_sqliteinfo",
+        description="Get information about an OakVar result SQLite database",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "dbpath": {
+                    "type": "string",
+                    "description": "Path to the SQLite database file",
                 },
-                "required": ["dbpath"],
             },
-        ),
-        # --- Data Tools ---
-        Tool(
-            name="oakvar_sqliteinfo",
-            description="Get information about an OakVar result SQLite database",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "dbpath": {
-                        "type": "string",
-                        "description": "Path to the SQLite database file",
-                    },
+            "required": ["dbpath"],
+        },
+    ),
+    Tool(
+        name="oakvar_filtersqlite",
+        description="Create a filtered copy of an OakVar result database",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "dbpaths": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Paths to SQLite database files to filter",
+                },
+                "filterpath": {
+                    "type": "string",
+                    "description": "Path to filter configuration file",
+                },
+                "filtersql": {
+                    "type": "string",
+                    "description": "SQL filter expression",
+                },
+                "includesample": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Samples to include",
+                    "default": [],
+                },
+                "excludesample": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "Samples to exclude",
+                    "default": [],
+                },
+                "suffix": {
+                    "type": "string",
+                    "description": "Suffix for filtered output file",
+                    "default": "filtered",
+                },
+                "out": {
+                    "type": "string",
+                    "description": "Output directory",
+                    "default": ".",
                 },
-                "required": ["dbpath"],
             },
-        ),
-        Tool(
-            name="oakvar_filtersqlite",
-            description="Create a filtered copy of an OakVar result database",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "dbpaths": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Paths to SQLite database files to filter",
-                    },
-                    "filterpath": {
-                        "type": "string",
-                        "description": "Path to filter configuration file",
-                    },
-                    "filtersql": {
-                        "type": "string",
-                        "description": "SQL filter expression",
-                    },
-                    "includesample": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Samples to include",
-                    },
-                    "excludesample": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "Samples to exclude",
-                    },
-                    "suffix": {
-                        "type": "string",
-                        "description": "Suffix for filtered output file",
-                        "default": "filtered",
-                    },
-                    "out": {
-                        "type": "string",
-                        "description": "Output directory",
-                        "default": ".",
-                    },
+            "required": ["dbpaths"],
+        },
+    ),
+    Tool(
+        name="oakvar_query",
+        description="Execute a SQL query on an OakVar result database",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "dbpath": {
+                    "type": "string",
+                    "description": "Path to the SQLite database file",
+                },
+                "sql": {
+                    "type": "string",
+                    "description": "SQL query to execute (SELECT only for safety)",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of rows to return",
+                    "default": 100,
                 },
-                "required": ["dbpaths"],
             },
-        ),
-        Tool(
-            name="oakvar_query",
-            description="Execute a SQL query on an OakVar result database",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "dbpath": {
-                        "type": "string",
-                        "description": "Path to the SQLite database file",
-                    },
-                    "sql": {
-                        "type": "string",
-                        "description": "SQL query to execute (SELECT only for safety)",
-                    },
-                    "limit": {
-                        "type": "integer",
-                        "description": "Maximum number of rows to return",
-                        "default": 100,
-                    },
+            "required": ["dbpath", "sql"],
+        },
+    ),
+    # --- Development Tools ---
+    Tool(
+        name="oakvar_new_module",
+        description="Create a new OakVar module template",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "module_name": {
+                    "type": "string",
+                    "description": "Name for the new module",
+                },
+                "module_type": {
+                    "type": "string",
+                    "description": "Type of module (annotator, reporter, converter, etc.)",
+                    "enum": ["annotator", "reporter", "converter", "mapper", "postaggregator"],
                 },
-                "required": ["dbpath", "sql"],
             },
-        ),
-        # --- Development Tools ---
-        Tool(
-            name="oakvar_new_module",
-            description="Create a new OakVar module template",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "module_name": {
-                        "type": "string",
-                        "description": "Name for the new module",
-                    },
-                    "module_type": {
-                        "type": "string",
-                        "description": "Type of module (annotator, reporter, converter, etc.)",
-                        "enum": ["annotator", "reporter", "converter", "mapper", "postaggregator"],
-                    },
+            "required": ["module_name", "module_type"],
+        },
+    ),
+    Tool(
+        name="oakvar_new_exampleinput",
+        description="Create an example input file for testing",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "directory": {
+                    "type": "string",
+                    "description": "Directory to create the example input file in",
+                    "default": ".",
                 },
-                "required": ["module_name", "module_type"],
             },
-        ),
-        Tool(
-            name="oakvar_new_exampleinput",
-            description="Create an example input file for testing",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "directory": {
-                        "type": "string",
-                        "description": "Directory to create the example input file in",
-                        "default": ".",
-                    },
+            "required": [],
+        },
+    ),
+    Tool(
+        name="oakvar_module_pack",
+        description="Pack a module for distribution/registration",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "module_name": {
+                    "type": "string",
+                    "description": "Name of the module to pack",
+                },
+                "outdir": {
+                    "type": "string",
+                    "description": "Output directory for the packed module",
+                },
+                "code_only": {
+                    "type": "boolean",
+                    "description": "Pack only code (not data)",
+                    "default": False,
                 },
-                "required": [],
             },
-        ),
-        Tool(
-            name="oakvar_module_pack",
-            description="Pack a module for distribution/registration",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "module_name": {
-                        "type": "string",
-                        "description": "Name of the module to pack",
-                    },
-                    "outdir": {
-                        "type": "string",
-                        "description": "Output directory for the packed module",
-                    },
-                    "code_only": {
-                        "type": "boolean",
-                        "description": "Pack only code (not data)",
-                        "default": False,
-                    },
+            "required": ["module_name"],
+        },
+    ),
+    # --- Store Tools ---
+    Tool(
+        name="oakvar_store_fetch",
+        description="Fetch/refresh the OakVar store cache",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "refresh_db": {
+                    "type": "boolean",
+                    "description": "Fetch a clean copy of the store database",
+                    "default": False,
+                },
+                "clean": {
+                    "type": "boolean",
+                    "description": "Install store cache from scratch",
+                    "default": False,
                 },
-                "required": ["module_name"],
             },
-        ),
-        # --- Store Tools ---
-        Tool(
-            name="oakvar_store_fetch",
-            description="Fetch/refresh the OakVar store cache",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "refresh_db": {
-                        "type": "boolean",
-                        "description": "Fetch a clean copy of the store database",
-                        "default": False,
-                    },
-                    "clean": {
-                        "type": "boolean",
-                        "description": "Install store cache from scratch",
-                        "default": False,
-                    },
+            "required": [],
+        },
+    ),
+    Tool(
+        name="oakvar_store_register",
+        description="Register a module in the OakVar store",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "module_name": {
+                    "type": "string",
+                    "description": "Name of the module to register",
+                },
+                "code_url": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "URLs of code zip files",
+                    "default": [],
+                },
+                "data_url": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "URLs of data zip files",
+                    "default": [],
                 },
-                "required": [],
             },
-        ),
-        Tool(
-            name="oakvar_store_register",
-            description="Register a module in the OakVar store",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "module_name": {
-                        "type": "string",
-                        "description": "Name of the module to register",
-                    },
-                    "code_url": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "URLs of code zip files",
-                    },
-                    "data_url": {
-                        "type": "array",
-                        "items": {"type": "string"},
-                        "description": "URLs of data zip files",
+            "required": ["module_name"],
+        },
+    ),
+    # --- Batch Tools ---
+    Tool(
+        name="oakvar_batch",
+        description="Run several OakVar tool calls in a single request",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "calls": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {
+                                "type": "string",
+                                "description": "Name of the tool to call",
+                            },
+                            "arguments": {
+                                "type": "object",
+                                "description": "Arguments for the tool",
+                                "default": {},
+                            },
+                        },
+                        "required": ["name"],
                     },
+                    "description": "Tool calls to run, in order",
+                },
+                "parallel": {
+                    "type": "boolean",
+                    "description": "Run the calls concurrently (only for independent calls)",
+                    "default": False,
                 },
-                "required": ["module_name"],
             },
-        ),
-    ]
+            "required": ["calls"],
+        },
+    ),
+]
+
+
+# Compiled argument validators, one per tool, built from the schemas above
+_VALIDATORS: Dict[str, Draft202012Validator] = {
+    tool.name: Draft202012Validator(tool.inputSchema) for tool in _TOOLS
+}
+
+
+# Per-tool argument defaults, taken from the "default" entries in each schema.
+# Copied so the schema values advertised to clients are never shared.
+_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    tool.name: {
+        key: copy.deepcopy(prop["default"])
+        for key, prop in tool.inputSchema["properties"].items()
+        if "default" in prop
+    }
+    for tool in _TOOLS
+}
+
+
+def _with_defaults(name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge a tool's schema defaults under the caller's arguments."""
+    merged = dict(args)
+    for key, value in _DEFAULTS[name].items():
+        if key not in merged:
+            # Copy so list defaults mutated by OakVar don't leak into later
+            # calls; defaults are flat lists or scalars, so shallow is enough.
+            merged[key] = copy.copy(value)
+    return merged
+
+
+@server.list_tools()
+async def list_tools() -> List[Tool]:
+    """List all available OakVar MCP tools."""
+    return list(_TOOLS)
 
 
 # =============================================================================
 # Tool Call Handlers
 # =============================================================================
 
-@server.call_tool()
+# Arguments are validated by _execute_tool with precompiled validators, so
+# the SDK's per-call jsonschema.validate is switched off.
+@server.call_tool(validate_input=False)
 async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
     """Handle tool calls from MCP clients."""
+    result = await _execute_tool(name, arguments)
+    return [TextContent(type="text", text=result)]
+
+
+async def _execute_tool(name: str, arguments: Dict[str, Any]) -> str:
+    """Validate arguments and run a tool, formatting any failure as a response."""
+    validator = _VALIDATORS.get(name)
+    if validator is not None:
+        invalid = best_match(validator.iter_errors(arguments))
+        if invalid is not None:
+            return _format_response(
+                data=None,
+                success=False,
+                error=f"Invalid arguments for {name}: {invalid.message}"
+            )
+    
     try:
-        result = await _dispatch_tool(name, arguments)
-        return [TextContent(type="text", text=result)]
+        return await _dispatch_tool(name, arguments)
     except Exception as e:
-        logger.exception(f"Error executing tool {name}")
-        error_response = _format_response(
+        logger.error("Error executing tool %s", name, exc_info=True)
+        return _format_response(
             data=None,
             success=False,
-            error=f"{type(e).__name__}: {str(e)}"
+            error=f"{type(e).__name__}: {e}"
         )
-        return [TextContent(type="text", text=error_response)]
 
 
 async def _dispatch_tool(name: str, arguments: Dict[str, Any]) -> str:
     """Dispatch tool calls to appropriate handlers."""
-    
-    # System tools
-    if name == "oakvar_version":
-        return await _tool_version()
-    elif name == "oakvar_system_check":
-        return await _tool_system_check()
-    elif name == "oakvar_system_setup":
-        return await _tool_system_setup(arguments)
-    elif name == "oakvar_modules_dir":
-        return await _tool_modules_dir(arguments)
-    
-    # Module tools
-    elif name == "oakvar_module_list":
-        return await _tool_module_list(arguments)
-    elif name == "oakvar_module_info":
-        return await _tool_module_info(arguments)
-    elif name == "oakvar_module_install":
-        return await _tool_module_install(arguments)
-    elif name == "oakvar_module_uninstall":
-        return await _tool_module_uninstall(arguments)
-    elif name == "oakvar_module_update":
-        return await _tool_module_update(arguments)
-    
-    # Pipeline tools
-    elif name == "oakvar_run":
-        return await _tool_run(arguments)
-    elif name == "oakvar_report":
-        return await _tool_report(arguments)
-    
-    # Data tools
-    elif name == "oakvar_sqliteinfo":
-        return await _tool_sqliteinfo(arguments)
-    elif name == "oakvar_filtersqlite":
-        return await _tool_filtersqlite(arguments)
-    elif name == "oakvar_query":
-        return await _tool_query(arguments)
-    
-    # Development tools
-    elif name == "oakvar_new_module":
-        return await _tool_new_module(arguments)
-    elif name == "oakvar_new_exampleinput":
-        return await _tool_new_exampleinput(arguments)
-    elif name == "oakvar_module_pack":
-        return await _tool_module_pack(arguments)
-    
-    # Store tools
-    elif name == "oakvar_store_fetch":
-        return await _tool_store_fetch(arguments)
-    elif name == "oakvar_store_register":
-        return await _tool_store_register(arguments)
-    
-    else:
+    handler = _DISPATCH.get(name)
+    if handler is None:
         raise ValueError(f"Unknown tool: {name}")
+    return await handler(arguments)
 
 
 # =============================================================================
@@ -569,25 +665,40 @@ async def _dispatch_tool(name: str, arguments: Dict[str, Any]) -> str:
 
 async def _tool_version() -> str:
     """Get OakVar version."""
-    ov = _ensure_oakvar()
-    version = ov.api.version()
-    return _format_response({"version": version})
+    global _VERSION_CACHE
+    if _VERSION_CACHE is None:
+        ov = _ensure_oakvar()
+        version = ov.api.version()
+        _VERSION_CACHE = _format_response({"version": version})
+    return _VERSION_CACHE
 
 
 async def _tool_system_check() -> str:
     """Check OakVar system."""
-    ov = _ensure_oakvar()
-    result = ov.api.system.check()
-    return _format_response({"check_passed": result})
+    global _SYSTEM_CHECK_CACHE
+    now = time.monotonic()
+    if _SYSTEM_CHECK_CACHE is None or now - _SYSTEM_CHECK_CACHE[0] > _SYSTEM_CHECK_TTL:
+        ov = _ensure_oakvar()
+        result = ov.api.system.check()
+        _SYSTEM_CHECK_CACHE = (now, _format_response({"check_passed": result}))
+    return _SYSTEM_CHECK_CACHE[1]
+
+
+def _invalidate_system_check() -> None:
+    """Drop the cached system check after a call that changes system state."""
+    global _SYSTEM_CHECK_CACHE
+    _SYSTEM_CHECK_CACHE = None
 
 
 async def _tool_system_setup(args: Dict[str, Any]) -> str:
     """Setup OakVar system."""
+    args = _with_defaults("oakvar_system_setup", args)
     ov = _ensure_oakvar()
     ov.api.system.setup(
-        clean=args.get("clean", False),
-        refresh_db=args.get("refresh_db", False),
+        clean=args["clean"],
+        refresh_db=args["refresh_db"],
     )
+    _invalidate_system_check()
     return _format_response({"message": "System setup completed"})
 
 
@@ -596,6 +707,8 @@ async def _tool_modules_dir(args: Dict[str, Any]) -> str:
     ov = _ensure_oakvar()
     directory = args.get("directory")
     result = ov.api.system.md(directory=directory)
+    if directory:
+        _invalidate_system_check()
     return _format_response({"modules_dir": str(result) if result else None})
 
 
@@ -603,22 +716,27 @@ async def _tool_modules_dir(args: Dict[str, Any]) -> str:
 
 async def _tool_module_list(args: Dict[str, Any]) -> str:
     """List modules."""
+    args = _with_defaults("oakvar_module_list", args)
     ov = _ensure_oakvar()
     modules = ov.api.module.ls(
-        module_names=args.get("module_names", [".*"]),
-        module_types=args.get("module_types", []),
-        search_store=args.get("search_store", False),
-        tags=args.get("tags", []),
+        module_names=args["module_names"],
+        module_types=args["module_types"],
+        search_store=args["search_store"],
+        tags=args["tags"],
     )
+    fields = args.get("fields")
+    if fields:
+        modules = [{k: m.get(k) for k in fields} for m in modules]
     return _format_response({"modules": modules, "count": len(modules)})
 
 
 async def _tool_module_info(args: Dict[str, Any]) -> str:
     """Get module info."""
+    args = _with_defaults("oakvar_module_info", args)
     ov = _ensure_oakvar()
     info = ov.api.module.info(
         module_name=args["module_name"],
-        local=args.get("local", False),
+        local=args["local"],
     )
     if info is None:
         return _format_response(
@@ -631,14 +749,17 @@ async def _tool_module_info(args: Dict[str, Any]) -> str:
 
 async def _tool_module_install(args: Dict[str, Any]) -> str:
     """Install modules."""
+    args = _with_defaults("oakvar_module_install", args)
     ov = _ensure_oakvar()
-    result = ov.api.module.install(
+    result = await asyncio.to_thread(
+        ov.api.module.install,
         module_names=args["module_names"],
-        overwrite=args.get("overwrite", False),
-        skip_dependencies=args.get("skip_dependencies", False),
+        overwrite=args["overwrite"],
+        skip_dependencies=args["skip_dependencies"],
         yes=True,  # Auto-confirm for MCP usage
     )
     success = result is None or result is True
+    _invalidate_system_check()
     return _format_response(
         {"installed": args["module_names"]},
         success=success,
@@ -649,10 +770,12 @@ async def _tool_module_install(args: Dict[str, Any]) -> str:
 async def _tool_module_uninstall(args: Dict[str, Any]) -> str:
     """Uninstall modules."""
     ov = _ensure_oakvar()
-    result = ov.api.module.uninstall(
+    result = await asyncio.to_thread(
+        ov.api.module.uninstall,
         module_names=args["module_names"],
         yes=True,  # Auto-confirm for MCP usage
     )
+    _invalidate_system_check()
     return _format_response(
         {"uninstalled": args["module_names"]},
         success=result,
@@ -661,11 +784,14 @@ async def _tool_module_uninstall(args: Dict[str, Any]) -> str:
 
 async def _tool_module_update(args: Dict[str, Any]) -> str:
     """Update modules."""
+    args = _with_defaults("oakvar_module_update", args)
     ov = _ensure_oakvar()
-    result = ov.api.module.update(
-        module_name_patterns=args.get("module_name_patterns", []),
+    result = await asyncio.to_thread(
+        ov.api.module.update,
+        module_name_patterns=args["module_name_patterns"],
         yes=True,  # Auto-confirm for MCP usage
     )
+    _invalidate_system_check()
     return _format_response(
         {"message": "Update completed" if result else "Update failed"},
         success=result,
@@ -676,16 +802,14 @@ async def _tool_module_update(args: Dict[str, Any]) -> str:
 
 async def _tool_run(args: Dict[str, Any]) -> str:
     """Run OakVar pipeline."""
+    args = _with_defaults("oakvar_run", args)
     ov = _ensure_oakvar()
     
-    inputs = args["inputs"]
-    if isinstance(inputs, str):
-        inputs = [inputs]
-    
-    result = ov.api.run(
-        inputs=inputs,
-        annotators=args.get("annotators", []),
-        report_types=args.get("report_types", []),
+    result = await asyncio.to_thread(
+        ov.api.run,
+        inputs=args["inputs"],
+        annotators=args["annotators"],
+        report_types=args["report_types"],
         output_dir=args.get("output_dir", []),
         genome=args.get("genome"),
         run_name=args.get("run_name", []),
@@ -701,9 +825,9 @@ async def _tool_run(args: Dict[str, Any]) -> str:
 async def _tool_report(args: Dict[str, Any]) -> str:
     """Generate reports."""
     ov = _ensure_oakvar()
-    from pathlib import Path
     
-    result = ov.api.report(
+    result = await asyncio.to_thread(
+        ov.api.report,
         dbpath=args["dbpath"],
         report_types=args.get("report_types"),
         output_dir=Path(args["output_dir"]) if args.get("output_dir") else None,
@@ -723,35 +847,103 @@ async def _tool_report(args: Dict[str, Any]) -> str:
 async def _tool_sqliteinfo(args: Dict[str, Any]) -> str:
     """Get SQLite database info."""
     ov = _ensure_oakvar()
-    info = ov.api.util.sqliteinfo(dbpath=args["dbpath"])
+    info = await asyncio.to_thread(ov.api.util.sqliteinfo, dbpath=args["dbpath"])
     return _format_response(info)
 
 
 async def _tool_filtersqlite(args: Dict[str, Any]) -> str:
     """Filter SQLite database."""
+    args = _with_defaults("oakvar_filtersqlite", args)
     ov = _ensure_oakvar()
-    ov.api.util.filtersqlite(
+    await asyncio.to_thread(
+        ov.api.util.filtersqlite,
         dbpaths=args["dbpaths"],
         filterpath=args.get("filterpath"),
         filtersql=args.get("filtersql"),
-        includesample=args.get("includesample", []),
-        excludesample=args.get("excludesample", []),
-        suffix=args.get("suffix", "filtered"),
-        out=args.get("out", "."),
+        includesample=args["includesample"],
+        excludesample=args["excludesample"],
+        suffix=args["suffix"],
+        out=args["out"],
     )
     return _format_response({"message": "Filtering completed"})
 
 
+def _connect_readonly(dbpath: str) -> sqlite3.Connection:
+    """Open a result database read-only, tuned for large scans."""
+    uri = f"{Path(dbpath).resolve().as_uri()}?mode=ro"
+    # Pooled connections are shared across to_thread workers
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.execute("PRAGMA cache_size=-65536")  # 64 MiB page cache
+    conn.execute("PRAGMA mmap_size=268435456")  # 256 MiB memory map
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _get_conn(dbpath: str) -> sqlite3.Connection:
+    """Get a pooled read-only connection for a result database."""
+    realpath = os.path.realpath(dbpath)
+    st = os.stat(realpath)
+    # Include the inode so a database recreated by a new run gets a fresh connection
+    key = (realpath, st.st_dev, st.st_ino)
+    with _CONN_POOL_LOCK:
+        conn = _CONN_POOL.get(key)
+        if conn is not None:
+            _CONN_POOL.move_to_end(key)
+            return conn
+        # Drop entries for an earlier file at this path (e.g. a result DB
+        # replaced by a new run); like evicted ones, the connection closes,
+        # releasing the deleted file, once no query is still using it.
+        for stale in [k for k in _CONN_POOL if k[0] == realpath]:
+            del _CONN_POOL[stale]
+        conn = _connect_readonly(realpath)
+        _CONN_POOL[key] = conn
+        if len(_CONN_POOL) > _CONN_POOL_SIZE:
+            # Not closed explicitly: a query in another thread may still be
+            # using it, and it is closed once the last reference is dropped.
+            _CONN_POOL.popitem(last=False)
+        return conn
+
+
+def _run_query_sync(dbpath: str, sql: str) -> str:
+    """Run a SELECT query and serialize the result (blocking)."""
+    cursor = _get_conn(dbpath).cursor()
+    
+    try:
+        cursor.execute(sql)
+        columns = [description[0] for description in cursor.description]
+        
+        # Stream rows into the JSON body in chunks rather than materializing
+        # the whole result set; the envelope matches _format_response.
+        out = io.StringIO()
+        out.write('{"success": true, "data": {"columns": ')
+        out.write(orjson.dumps(columns).decode())
+        out.write(', "rows": [')
+        row_count = 0
+        while True:
+            chunk = cursor.fetchmany(_QUERY_FETCH_SIZE)
+            if not chunk:
+                break
+            for row in chunk:
+                if row_count:
+                    out.write(", ")
+                out.write(orjson.dumps(dict(row), default=str).decode())
+                row_count += 1
+        out.write(f'], "row_count": {row_count}}}}}')
+        return out.getvalue()
+    finally:
+        cursor.close()
+
+
 async def _tool_query(args: Dict[str, Any]) -> str:
     """Execute SQL query on result database."""
-    import sqlite3
-    
+    args = _with_defaults("oakvar_query", args)
     dbpath = args["dbpath"]
     sql = args["sql"].strip()
-    limit = args.get("limit", 100)
+    limit = args["limit"]
     
     # Safety check: only allow SELECT queries
-    if not sql.upper().startswith("SELECT"):
+    if not _SELECT_RE.match(sql):
         return _format_response(
             data=None,
             success=False,
@@ -759,26 +951,11 @@ async def _tool_query(args: Dict[str, Any]) -> str:
         )
     
     # Add LIMIT if not present
-    if "LIMIT" not in sql.upper():
+    if not _LIMIT_RE.search(sql):
         sql = f"{sql} LIMIT {limit}"
     
-    conn = sqlite3.connect(dbpath)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
-    try:
-        cursor.execute(sql)
-        rows = cursor.fetchall()
-        columns = [description[0] for description in cursor.description]
-        results = [dict(row) for row in rows]
-        
-        return _format_response({
-            "columns": columns,
-            "rows": results,
-            "row_count": len(results),
-        })
-    finally:
-        conn.close()
+    # SQLite work is blocking; keep it off the event loop
+    return await asyncio.to_thread(_run_query_sync, dbpath, sql)
 
 
 # --- Development Tools ---
@@ -798,9 +975,10 @@ async def _tool_new_module(args: Dict[str, Any]) -> str:
 
 async def _tool_new_exampleinput(args: Dict[str, Any]) -> str:
     """Create example input file."""
+    args = _with_defaults("oakvar_new_exampleinput", args)
     ov = _ensure_oakvar()
     result = ov.api.new.exampleinput(
-        directory=args.get("directory", "."),
+        directory=args["directory"],
     )
     return _format_response({
         "message": "Example input created",
@@ -810,14 +988,14 @@ async def _tool_new_exampleinput(args: Dict[str, Any]) -> str:
 
 async def _tool_module_pack(args: Dict[str, Any]) -> str:
     """Pack module for distribution."""
+    args = _with_defaults("oakvar_module_pack", args)
     ov = _ensure_oakvar()
-    from pathlib import Path
     
     outdir = Path(args["outdir"]) if args.get("outdir") else None
     result = ov.api.module.pack(
         module_name=args["module_name"],
         outdir=outdir,
-        code_only=args.get("code_only", False),
+        code_only=args["code_only"],
     )
     return _format_response({
         "message": f"Module '{args['module_name']}' packed",
@@ -829,10 +1007,11 @@ async def _tool_module_pack(args: Dict[str, Any]) -> str:
 
 async def _tool_store_fetch(args: Dict[str, Any]) -> str:
     """Fetch store cache."""
+    args = _with_defaults("oakvar_store_fetch", args)
     ov = _ensure_oakvar()
     result = ov.api.store.fetch(
-        refresh_db=args.get("refresh_db", False),
-        clean=args.get("clean", False),
+        refresh_db=args["refresh_db"],
+        clean=args["clean"],
     )
     return _format_response({
         "message": "Store cache fetched",
@@ -842,11 +1021,12 @@ async def _tool_store_fetch(args: Dict[str, Any]) -> str:
 
 async def _tool_store_register(args: Dict[str, Any]) -> str:
     """Register module in store."""
+    args = _with_defaults("oakvar_store_register", args)
     ov = _ensure_oakvar()
     result = ov.api.store.register(
         module_name=args["module_name"],
-        code_url=args.get("code_url", []),
-        data_url=args.get("data_url", []),
+        code_url=args["code_url"],
+        data_url=args["data_url"],
     )
     return _format_response({
         "message": f"Module '{args['module_name']}' registered",
@@ -854,6 +1034,76 @@ async def _tool_store_register(args: Dict[str, Any]) -> str:
     })
 
 
+# --- Batch Tools ---
+
+async def _tool_batch(args: Dict[str, Any]) -> str:
+    """Run several tool calls in one request."""
+    args = _with_defaults("oakvar_batch", args)
+    
+    async def _step(call: Dict[str, Any]) -> Dict[str, Any]:
+        name = call["name"]
+        if name == "oakvar_batch":
+            result = _format_response(
+                data=None,
+                success=False,
+                error="oakvar_batch calls cannot be nested"
+            )
+        else:
+            result = await _execute_tool(name, call.get("arguments", {}))
+        return {"name": name, **orjson.loads(result)}
+    
+    if args["parallel"]:
+        steps = await asyncio.gather(*(_step(call) for call in args["calls"]))
+    else:
+        steps = [await _step(call) for call in args["calls"]]
+    return _format_response({"steps": steps})
+
+
+# =============================================================================
+# Dispatch Table
+# =============================================================================
+
+async def _tool_version_nop_args(args: Dict[str, Any]) -> str:
+    """Adapt `_tool_version` to the common handler signature."""
+    return await _tool_version()
+
+
+async def _tool_system_check_nop_args(args: Dict[str, Any]) -> str:
+    """Adapt `_tool_system_check` to the common handler signature."""
+    return await _tool_system_check()
+
+
+_DISPATCH: Dict[str, Callable[[Dict[str, Any]], Awaitable[str]]] = {
+    # System tools
+    "oakvar_version": _tool_version_nop_args,
+    "oakvar_system_check": _tool_system_check_nop_args,
+    "oakvar_system_setup": _tool_system_setup,
+    "oakvar_modules_dir": _tool_modules_dir,
+    # Module tools
+    "oakvar_module_list": _tool_module_list,
+    "oakvar_module_info": _tool_module_info,
+    "oakvar_module_install": _tool_module_install,
+    "oakvar_module_uninstall": _tool_module_uninstall,
+    "oakvar_module_update": _tool_module_update,
+    # Pipeline tools
+    "oakvar_run": _tool_run,
+    "oakvar_report": _tool_report,
+    # Data tools
+    "oakvar_sqliteinfo": _tool_sqliteinfo,
+    "oakvar_filtersqlite": _tool_filtersqlite,
+    "oakvar_query": _tool_query,
+    # Development tools
+    "oakvar_new_module": _tool_new_module,
+    "oakvar_new_exampleinput": _tool_new_exampleinput,
+    "oakvar_module_pack": _tool_module_pack,
+    # Store tools
+    "oakvar_store_fetch": _tool_store_fetch,
+    "oakvar_store_register": _tool_store_register,
+    # Batch tools
+    "oakvar_batch": _tool_batch,
+}
+
+
 # =============================================================================
 # Main Entry Point
 # =============================================================================
@@ -880,7 +1130,6 @@ async def main():
 
 def run():
     """Entry point for the MCP server."""
-    import asyncio
     asyncio.run(main())
 
 
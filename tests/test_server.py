@@ -5,45 +5,90 @@ These tests verify the MCP server functionality.
 Note: Some tests require OakVar to be installed.
 """
 
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+import orjson
 import pytest
-import json
-from unittest.mock import patch, MagicMock
+from jsonschema import Draft202012Validator
+from mcp import types
+
+import oakvar_mcp.server as server
+from oakvar_mcp.server import (
+    _DEFAULTS,
+    _SELECT_RE,
+    _dispatch_tool,
+    _ensure_oakvar,
+    _format_response,
+    _format_response_obj,
+    _get_conn,
+    _tool_module_list,
+    _tool_query,
+    _tool_version,
+    _with_defaults,
+    call_tool,
+    list_tools,
+)
+
+
+def _make_variant_db(tmp_dir, schema, rows):
+    """Create test.sqlite in tmp_dir with a variant table holding rows."""
+    dbpath = Path(tmp_dir) / "test.sqlite"
+    conn = sqlite3.connect(dbpath)
+    conn.execute(f"CREATE TABLE variant ({schema})")
+    if rows:
+        placeholders = ", ".join("?" for _ in rows[0])
+        conn.executemany(f"INSERT INTO variant VALUES ({placeholders})", rows)
+    conn.commit()
+    conn.close()
+    return dbpath
+
+
+# One meta-schema validator, reused to check every tool's inputSchema
+_SCHEMA_VALIDATOR = Draft202012Validator(Draft202012Validator.META_SCHEMA)
+
+
+@pytest.fixture(scope="session")
+async def tools_list():
+    """The tool list, fetched once per test session."""
+    return await list_tools()
 
 
 class TestResponseFormatting:
     """Test the response formatting helper."""
     
     def test_format_response_success(self):
-        from oakvar_mcp.server import _format_response
+        result = _format_response_obj({"key": "value"})
         
-        result = _format_response({"key": "value"})
-        parsed = json.loads(result)
-        
-        assert parsed["success"] is True
-        assert parsed["data"]["key"] == "value"
-        assert "error" not in parsed
+        assert result == {"success": True, "data": {"key": "value"}}
     
     def test_format_response_with_error(self):
-        from oakvar_mcp.server import _format_response
+        result = _format_response_obj(None, success=False, error="Test error")
         
-        result = _format_response(None, success=False, error="Test error")
-        parsed = json.loads(result)
+        assert result == {"success": False, "data": None, "error": "Test error"}
+    
+    def test_format_response_round_trip(self):
+        result = _format_response({"key": "value", "path": Path("/tmp")}, success=False, error="Test error")
         
-        assert parsed["success"] is False
-        assert parsed["error"] == "Test error"
+        assert orjson.loads(result) == {
+            "success": False,
+            "data": {"key": "value", "path": "/tmp"},
+            "error": "Test error",
+        }
 
 
 class TestToolDefinitions:
     """Test that tools are properly defined."""
     
-    @pytest.mark.asyncio
-    async def test_list_tools_returns_tools(self):
-        from oakvar_mcp.server import list_tools
-        
-        tools = await list_tools()
-        
-        assert len(tools) > 0
-        tool_names = [t.name for t in tools]
+    @pytest.mark.asyncio_cooperative
+    async def test_list_tools_returns_tools(self, tools_list):
+        assert len(tools_list) > 0
+        tool_names = [t.name for t in tools_list]
         
         # Check core tools exist
         assert "oakvar_version" in tool_names
@@ -51,25 +96,40 @@ class TestToolDefinitions:
         assert "oakvar_run" in tool_names
         assert "oakvar_query" in tool_names
     
-    @pytest.mark.asyncio
-    async def test_tools_have_valid_schemas(self):
-        from oakvar_mcp.server import list_tools
-        
-        tools = await list_tools()
-        
-        for tool in tools:
+    @pytest.mark.asyncio_cooperative
+    async def test_tools_have_valid_schemas(self, tools_list):
+        for tool in tools_list:
             assert tool.name is not None
             assert tool.description is not None
             assert tool.inputSchema is not None
             assert tool.inputSchema["type"] == "object"
+            _SCHEMA_VALIDATOR.validate(tool.inputSchema)
+    
+    def test_defaults_come_from_schemas(self):
+        assert _DEFAULTS["oakvar_query"] == {"limit": 100}
+        assert _DEFAULTS["oakvar_module_list"]["module_names"] == [".*"]
+        assert _DEFAULTS["oakvar_version"] == {}
+    
+    def test_merged_defaults_are_not_shared(self):
+        inputs = ["input.vcf"]
+        report_types = ["csv"]
+        args = _with_defaults("oakvar_run", {"inputs": inputs, "report_types": report_types})
+        args["annotators"].append("clinvar")
+        
+        # Caller-supplied values are passed through, not copied
+        assert args["inputs"] is inputs
+        assert args["report_types"] is report_types
+        
+        run_tool = next(tool for tool in server._TOOLS if tool.name == "oakvar_run")
+        assert _DEFAULTS["oakvar_run"]["annotators"] == []
+        assert run_tool.inputSchema["properties"]["annotators"]["default"] == []
+        assert _with_defaults("oakvar_run", {})["annotators"] == []
 
 
 class TestOakVarDetection:
     """Test OakVar detection logic."""
     
     def test_ensure_oakvar_when_installed(self):
-        from oakvar_mcp.server import _ensure_oakvar
-        
         # This test will only pass if OakVar is installed
         try:
             ov = _ensure_oakvar()
@@ -77,52 +137,254 @@ class TestOakVarDetection:
         except RuntimeError:
             pytest.skip("OakVar not installed")
     
-    def test_ensure_oakvar_when_not_installed(self):
-        from oakvar_mcp.server import _ensure_oakvar
+    def test_ensure_oakvar_when_not_installed(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "oakvar", None)
+        # Clear the cached OakVar reference so the import is retried
+        monkeypatch.setattr(server, "_OV", None)
         
-        with patch.dict('sys.modules', {'oakvar': None}):
-            # Force reimport to trigger the check
-            pass  # This is tricky to test properly
+        with pytest.raises(RuntimeError, match="OakVar is not installed"):
+            server._ensure_oakvar()
 
 
 class TestToolDispatch:
     """Test tool dispatch logic."""
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_dispatch_unknown_tool(self):
-        from oakvar_mcp.server import _dispatch_tool
-        
         with pytest.raises(ValueError, match="Unknown tool"):
             await _dispatch_tool("nonexistent_tool", {})
+    
+    @pytest.mark.asyncio_cooperative
+    async def test_call_tool_rejects_invalid_arguments(self):
+        result = await call_tool("oakvar_run", {"inputs": "input.vcf"})
+        parsed = orjson.loads(result[0].text)
+        
+        assert parsed["success"] is False
+        assert "Invalid arguments for oakvar_run" in parsed["error"]
+    
+    @pytest.mark.asyncio_cooperative
+    async def test_sdk_handler_defers_validation_to_server(self):
+        handler = server.server.request_handlers[types.CallToolRequest]
+        request = types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(name="oakvar_run", arguments={"inputs": "input.vcf"}),
+        )
+        
+        result = await handler(request)
+        parsed = orjson.loads(result.root.content[0].text)
+        
+        assert "Invalid arguments for oakvar_run" in parsed["error"]
+    
+    @pytest.mark.asyncio_cooperative
+    async def test_batch_runs_each_call(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dbpath = str(_make_variant_db(tmp_dir, "chrom TEXT, pos INTEGER", [("chr1", 1), ("chr2", 2)]))
+            
+            for parallel in (False, True):
+                result = await _dispatch_tool("oakvar_batch", {
+                    "calls": [
+                        {"name": "oakvar_query", "arguments": {"dbpath": dbpath, "sql": "SELECT pos FROM variant WHERE chrom = 'chr1'"}},
+                        {"name": "oakvar_query", "arguments": {"dbpath": "test.sqlite", "sql": "DELETE FROM variant"}},
+                        {"name": "oakvar_batch", "arguments": {"calls": []}},
+                        {"name": "nonexistent_tool"},
+                        {"name": "oakvar_query", "arguments": {"dbpath": dbpath, "sql": "SELECT pos FROM variant WHERE chrom = 'chr2'"}},
+                    ],
+                    "parallel": parallel,
+                })
+                steps = orjson.loads(result)["data"]["steps"]
+                
+                assert [step["name"] for step in steps] == [
+                    "oakvar_query", "oakvar_query", "oakvar_batch", "nonexistent_tool", "oakvar_query",
+                ]
+                assert [step["success"] for step in steps] == [True, False, False, False, True]
+                assert steps[0]["data"]["rows"] == [{"pos": 1}]
+                assert steps[4]["data"]["rows"] == [{"pos": 2}]
+                assert "nested" in steps[2]["error"]
+                assert "Unknown tool" in steps[3]["error"]
 
 
 class TestQueryTool:
     """Test the SQL query tool safety features."""
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_query_rejects_non_select(self):
-        from oakvar_mcp.server import _tool_query
-        
         result = await _tool_query({
             "dbpath": "test.sqlite",
             "sql": "DELETE FROM variant"
         })
-        parsed = json.loads(result)
+        parsed = orjson.loads(result)
         
         assert parsed["success"] is False
         assert "SELECT" in parsed["error"]
+        assert _SELECT_RE.match("DELETE FROM variant") is None
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_query_rejects_update(self):
-        from oakvar_mcp.server import _tool_query
-        
         result = await _tool_query({
             "dbpath": "test.sqlite",
             "sql": "UPDATE variant SET chrom='1'"
         })
-        parsed = json.loads(result)
+        parsed = orjson.loads(result)
         
         assert parsed["success"] is False
+        assert _SELECT_RE.match("UPDATE variant SET chrom='1'") is None
+        assert _SELECT_RE.match("  select * from variant") is not None
+    
+    @pytest.mark.asyncio_cooperative
+    async def test_query_returns_rows(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dbpath = _make_variant_db(tmp_dir, "chrom TEXT, pos INTEGER", [("chr1", i) for i in range(1200)])
+            
+            result = await _tool_query({
+                "dbpath": str(dbpath),
+                "sql": "SELECT chrom, pos FROM variant",
+                "limit": 1100,
+            })
+            parsed = orjson.loads(result)
+            
+            assert parsed["success"] is True
+            assert parsed["data"]["columns"] == ["chrom", "pos"]
+            assert parsed["data"]["row_count"] == 1100
+            assert parsed["data"]["rows"][0] == {"chrom": "chr1", "pos": 0}
+    
+    @pytest.mark.asyncio_cooperative
+    async def test_query_reuses_pooled_connection(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dbpath = _make_variant_db(tmp_dir, "chrom TEXT", [("chr1",)])
+            
+            args = {"dbpath": str(dbpath), "sql": "SELECT chrom FROM variant"}
+            first = orjson.loads(await _tool_query(args))
+            second = orjson.loads(await _tool_query(args))
+            
+            assert first == second
+            assert _get_conn(str(dbpath)) is _get_conn(str(Path(tmp_dir) / "." / "test.sqlite"))
+    
+    @pytest.mark.asyncio_cooperative
+    async def test_query_connections_are_read_only(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dbpath = _make_variant_db(tmp_dir, "chrom TEXT", [("chr1",)])
+            missing = Path(tmp_dir) / "missing.sqlite"
+            
+            with pytest.raises(sqlite3.OperationalError, match="readonly database"):
+                _get_conn(str(dbpath)).execute("CREATE TABLE x (a)")
+            with pytest.raises(sqlite3.OperationalError):
+                server._connect_readonly(str(missing))
+            
+            result = await server._execute_tool("oakvar_query", {
+                "dbpath": str(missing),
+                "sql": "SELECT * FROM variant",
+            })
+            parsed = orjson.loads(result)
+            
+            assert parsed["success"] is False
+            assert not missing.exists()
+    
+    def test_pool_drops_replaced_database(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dbpath = _make_variant_db(tmp_dir, "chrom TEXT", [("chr1",)])
+            old_conn = _get_conn(str(dbpath))
+            
+            # Simulate a new run recreating the result database
+            moved = Path(tmp_dir) / "old.sqlite"
+            dbpath.rename(moved)
+            _make_variant_db(tmp_dir, "chrom TEXT", [("chr2",)])
+            moved.unlink()
+            
+            new_conn = _get_conn(str(dbpath))
+            realpath = os.path.realpath(dbpath)
+            
+            assert new_conn is not old_conn
+            assert [k for k in server._CONN_POOL if k[0] == realpath] == [
+                (realpath, os.stat(realpath).st_dev, os.stat(realpath).st_ino)
+            ]
+            assert new_conn.execute("SELECT chrom FROM variant").fetchone()[0] == "chr2"
+    
+    @pytest.mark.asyncio_cooperative
+    async def test_query_limit_detection_uses_word_boundaries(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            dbpath = _make_variant_db(tmp_dir, "limited_col INTEGER", [(i,) for i in range(10)])
+            
+            result = await _tool_query({
+                "dbpath": str(dbpath),
+                "sql": "select limited_col from variant",
+                "limit": 3,
+            })
+            parsed = orjson.loads(result)
+            
+            assert parsed["success"] is True
+            assert parsed["data"]["row_count"] == 3
+
+
+class TestModuleListTool:
+    """Test the module list projection."""
+    
+    # Synchronous because it patches module state (see TestResponseCaching)
+    def test_module_list_fields(self, monkeypatch):
+        modules = [
+            {"name": "clinvar", "version": "1.0", "type": "annotator"},
+            {"name": "vcfreporter", "type": "reporter"},
+        ]
+        fake_ov = SimpleNamespace(api=SimpleNamespace(module=SimpleNamespace(
+            ls=lambda **kwargs: [dict(m) for m in modules],
+        )))
+        monkeypatch.setattr(server, "_OV", fake_ov)
+        
+        projected = orjson.loads(asyncio.run(server._tool_module_list({"fields": ["name", "version"]})))
+        full = orjson.loads(asyncio.run(server._tool_module_list({})))
+        
+        assert projected["data"] == {
+            "modules": [
+                {"name": "clinvar", "version": "1.0"},
+                {"name": "vcfreporter", "version": None},
+            ],
+            "count": 2,
+        }
+        assert full["data"] == {"modules": modules, "count": 2}
+
+
+class TestResponseCaching:
+    """Test caching of static tool responses."""
+    
+    # Synchronous on purpose: it patches module state, so it must not overlap
+    # with the cooperative async tests.
+    def test_version_is_cached(self, monkeypatch):
+        calls = []
+        fake_ov = SimpleNamespace(api=SimpleNamespace(version=lambda: calls.append(1) or "2.10.0"))
+        monkeypatch.setattr(server, "_OV", fake_ov)
+        monkeypatch.setattr(server, "_VERSION_CACHE", None)
+        
+        first = asyncio.run(server._tool_version())
+        second = asyncio.run(server._tool_version())
+        
+        assert first == second
+        assert orjson.loads(first)["data"]["version"] == "2.10.0"
+        assert len(calls) == 1
+    
+    def test_system_check_cache_expires_and_invalidates(self, monkeypatch):
+        results = [False, True, True]
+        fake_ov = SimpleNamespace(api=SimpleNamespace(system=SimpleNamespace(
+            check=lambda: results.pop(0),
+            setup=lambda **kwargs: None,
+        )))
+        monkeypatch.setattr(server, "_OV", fake_ov)
+        monkeypatch.setattr(server, "_SYSTEM_CHECK_CACHE", None)
+        
+        def check_passed():
+            return orjson.loads(asyncio.run(server._tool_system_check()))["data"]["check_passed"]
+        
+        assert check_passed() is False
+        assert check_passed() is False  # served from cache
+        assert len(results) == 2
+        
+        # System setup drops the cached failure
+        asyncio.run(server._tool_system_setup({}))
+        assert check_passed() is True
+        assert len(results) == 1
+        
+        # An expired entry is refreshed without an invalidating call
+        monkeypatch.setattr(server, "_SYSTEM_CHECK_TTL", -1.0)
+        assert check_passed() is True
+        assert results == []
 
 
 # Integration tests (require OakVar installed)
@@ -130,29 +392,37 @@ class TestQueryTool:
 class TestIntegration:
     """Integration tests requiring OakVar installation."""
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_version_tool(self):
-        from oakvar_mcp.server import _tool_version
-        
         try:
             result = await _tool_version()
-            parsed = json.loads(result)
+            parsed = orjson.loads(result)
             
             assert parsed["success"] is True
             assert "version" in parsed["data"]
         except RuntimeError:
             pytest.skip("OakVar not installed")
     
-    @pytest.mark.asyncio
+    @pytest.mark.asyncio_cooperative
     async def test_module_list_tool(self):
-        from oakvar_mcp.server import _tool_module_list
-        
         try:
             result = await _tool_module_list({"module_names": [".*"]})
-            parsed = json.loads(result)
+            parsed = orjson.loads(result)
             
             assert parsed["success"] is True
             assert "modules" in parsed["data"]
             assert "count" in parsed["data"]
         except RuntimeError:
             pytest.skip("OakVar not installed")
+    
+    @pytest.mark.asyncio_cooperative
+    async def test_module_list_tool_fields(self):
+        try:
+            result = await _tool_module_list({"module_names": [".*"], "fields": ["name"]})
+            parsed = orjson.loads(result)
+            
+            assert parsed["success"] is True
+            for module in parsed["data"]["modules"]:
+                assert list(module) == ["name"]
+        except RuntimeError:
+            pytest.skip("OakVar not installed")